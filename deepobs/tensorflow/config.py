@@ -5,6 +5,7 @@ import tensorflow as tf
 DATA_DIR = "data_deepobs"
 BASELINE_DIR = "baselines_deepobs"
 TF_FLOAT_DTYPE = tf.float32
+AUTOTUNE_DATA_PIPELINE = False
 
 
 def get_data_dir():
@@ -32,3 +33,12 @@ def get_float_dtype():
 def set_float_dtype(dtype):
     global TF_FLOAT_DTYPE
     TF_FLOAT_DTYPE = dtype
+
+
+def get_autotune_data_pipeline():
+    return AUTOTUNE_DATA_PIPELINE
+
+
+def set_autotune_data_pipeline(autotune):
+    global AUTOTUNE_DATA_PIPELINE
+    AUTOTUNE_DATA_PIPELINE = autotune
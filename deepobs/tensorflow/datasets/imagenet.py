@@ -132,9 +132,12 @@ class imagenet(dataset.DataSet):
                 filenames = tf.matching_files(pattern)
                 filenames = tf.random_shuffle(filenames)
                 data = tf.data.TFRecordDataset(filenames)
+                if config.get_autotune_data_pipeline():
+                    num_parallel_calls = tf.data.experimental.AUTOTUNE
+                else:
+                    num_parallel_calls = 8 if self._data_augmentation else 4
                 data = data.map(
-                    parse_func,
-                    num_parallel_calls=(8 if self._data_augmentation else 4))
+                    parse_func, num_parallel_calls=num_parallel_calls)
                 if shuffle:
                     data = data.shuffle(buffer_size=20000)
                 data = data.batch(self._batch_size, drop_remainder=True)
@@ -2,6 +2,7 @@
 """Utility functions for running optimizers."""
 
 import time
+import tensorflow as tf
 
 
 def float2str(x):
@@ -11,8 +12,8 @@ def float2str(x):
 
 
 def make_run_name(weight_decay, batch_size, num_epochs, learning_rate,
-                  lr_sched_epochs, lr_sched_factors, random_seed,
-                  **optimizer_hyperparams):
+                  lr_sched_epochs, lr_sched_factors, random_seed, xla=False,
+                  mixed_precision=False, **optimizer_hyperparams):
     """Creates a name for the output file of an optimizer run.
 
   Args:
@@ -26,11 +27,15 @@ def make_run_name(weight_decay, batch_size, num_epochs, learning_rate,
     lr_sched_factors (list): A list of factors (floats) by which to change the
         learning rate.
     random_seed (int): Random seed used.
+    xla (bool): Whether the model was compiled with XLA. Defaults to ``False``.
+    mixed_precision (bool): Whether the model was trained with mixed precision.
+        Defaults to ``False``.
 
   Returns:
     run_folder_name: Name for the run folder consisting of num_epochs,
-        batch_size, weight_decay, all the optimizer hyperparameters, and the
-        learning rate (schedule).
+        batch_size, weight_decay, all the optimizer hyperparameters, the
+        learning rate (schedule) and markers if XLA or mixed precision were
+        used.
     file_name: Name for the output file, consisting of random seed and a time
         stamp.
   """
@@ -54,6 +59,12 @@ def make_run_name(weight_decay, batch_size, num_epochs, learning_rate,
         for epoch, factor in zip(lr_sched_epochs, lr_sched_factors):
             run_folder_name += ("_{0:d}_{1:s}".format(
                 epoch, float2str(factor * learning_rate)))
+    # XLA and mixed precision change the numerical results, so keep such runs
+    # separate.
+    if xla:
+        run_folder_name += "__xla"
+    if mixed_precision:
+        run_folder_name += "__mixed_precision"
     file_name = "random_seed__{0:d}__".format(random_seed)
     file_name += time.strftime("%Y-%m-%d-%H-%M-%S")
     return run_folder_name, file_name
@@ -102,3 +113,62 @@ def make_lr_schedule(lr_base, lr_sched_epochs, lr_sched_factors):
     sched = {n: f * lr_base for n, f in zip(lr_sched_epochs, lr_sched_factors)}
     sched[0] = lr_base
     return sched
+
+
+def make_streaming_means(loss, accuracy=None):
+    """Creates streaming means of the loss and accuracy within the graph.
+
+  The means are accumulated in local metric variables by running ``update_op``
+  once per mini-batch, so only the final averages have to be fetched. Running
+  ``reset_op`` sets them back to zero, e.g. at the start of an evaluation phase.
+
+  Args:
+    loss: A scalar tf.Tensor containing the mini-batch loss.
+    accuracy: A scalar tf.Tensor containing the mini-batch accuracy, or
+        ``None`` if the test problem has no accuracy (its mean is then a
+        constant ``0.0``).
+
+  Returns:
+    mean_loss: A scalar tf.Tensor with the mean loss over the mini-batches.
+    mean_accuracy: A scalar tf.Tensor with the mean accuracy over the
+        mini-batches.
+    update_op: A tensorflow operation adding the current mini-batch to both
+        means.
+    reset_op: A tensorflow operation resetting both means.
+  """
+    existing_names = set(
+        v.name for v in tf.get_collection(tf.GraphKeys.METRIC_VARIABLES))
+    with tf.variable_scope("evaluation"):
+        mean_loss, loss_update = tf.metrics.mean(loss)
+        if accuracy is not None:
+            mean_accuracy, accuracy_update = tf.metrics.mean(accuracy)
+        else:
+            mean_accuracy, accuracy_update = tf.constant(0.0), tf.no_op()
+    update_op = tf.group(loss_update, accuracy_update)
+    reset_op = tf.variables_initializer([
+        v for v in tf.get_collection(tf.GraphKeys.METRIC_VARIABLES)
+        if v.name not in existing_names
+    ])
+    return mean_loss, mean_accuracy, update_op, reset_op
+
+
+def iterate_batches(sess, fetches):
+    """Runs ``fetches`` on consecutive mini-batches until the end of the epoch.
+
+  Args:
+    sess: The tf.Session in which to run the fetches.
+    fetches: The fetches to run for each mini-batch, or a function mapping the
+        step number within the epoch to the fetches for that step.
+
+  Yields:
+    The results of ``sess.run`` for each mini-batch. The generator stops once
+    the input pipeline raises a ``tf.errors.OutOfRangeError``.
+  """
+    s = 0
+    while True:
+        try:
+            results = sess.run(fetches(s) if callable(fetches) else fetches)
+        except tf.errors.OutOfRangeError:
+            return
+        yield results
+        s += 1
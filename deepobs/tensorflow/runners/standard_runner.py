@@ -3,15 +3,50 @@
 from __future__ import print_function
 
 import argparse
+import array
 import os
 import json
 import importlib
 import tensorflow as tf
+from tensorflow.core.protobuf import rewriter_config_pb2
 
 from .. import config
 from .. import testproblems
 from . import runner_utils
 
+# Testproblem classes that have already been resolved, by name.
+_TESTPROBLEM_CLASSES = {}
+
+
+def _resolve_testproblem_cls(testproblem):
+    """Finds the class of a testproblem by its name.
+
+  A local module named ``testproblem`` containing a class of the same name takes
+  precedence over the DeepOBS testproblems. Resolved classes are cached.
+
+  Args:
+    testproblem (str): Name of the testproblem.
+
+  Returns:
+    The testproblem class.
+  """
+    if testproblem not in _TESTPROBLEM_CLASSES:
+        try:
+            testproblem_mod = importlib.import_module(testproblem)
+        except ModuleNotFoundError as e:
+            # Only fall back if there is no local module of this name, not if
+            # the local module fails to import one of its own dependencies.
+            if e.name != testproblem:
+                raise
+            testproblem_mod = None
+        if hasattr(testproblem_mod, testproblem):
+            testproblem_cls = getattr(testproblem_mod, testproblem)
+            print("Loading local testproblem.")
+        else:
+            testproblem_cls = getattr(testproblems, testproblem)
+        _TESTPROBLEM_CLASSES[testproblem] = testproblem_cls
+    return _TESTPROBLEM_CLASSES[testproblem]
+
 
 class StandardRunner(object):
     """Provides functionality to run optimizers on DeepOBS testproblems including
@@ -90,6 +125,8 @@ class StandardRunner(object):
             print_train_iter=None,
             tf_logging=None,
             no_logs=None,
+            xla=None,
+            mixed_precision=None,
             **optimizer_hyperparams):
         """Runs a given optimizer on a DeepOBS testproblem.
 
@@ -150,6 +187,14 @@ class StandardRunner(object):
           defaults to ``False``.
       no_logs (bool): If ``True`` no ``JSON`` files are created. If unspecified
           it defaults to ``False``.
+      xla (bool): If ``True`` the TensorFlow graph is just-in-time compiled
+          with XLA, which fuses operations of the model into larger kernels.
+          If unspecified it defaults to ``False``.
+      mixed_precision (bool): If ``True`` the model is trained with mixed
+          precision, i.e. suitable operations are computed in ``float16`` and
+          the loss is scaled dynamically. This requires TensorFlow ``>= 1.14``
+          and an optimizer inheriting from ``tf.train.Optimizer``. If
+          unspecified it defaults to ``False``.
       optimizer_hyperparams (dict): Keyword arguments for the hyperparameters of
           the optimizer. These are the ones specified in the ``hyperparams``
           dictionary passed to the ``__init__``.
@@ -316,6 +361,29 @@ class StandardRunner(object):
         else:
             args["no_logs"] = no_logs
 
+        if xla is None:
+            parser.add_argument(
+                "--xla",
+                action="store_const",
+                const=True,
+                default=False,
+                help="""Add this flag to just-in-time compile the model with
+          XLA.""")
+        else:
+            args["xla"] = xla
+
+        if mixed_precision is None:
+            parser.add_argument(
+                "--mixed_precision",
+                action="store_const",
+                const=True,
+                default=False,
+                help="""Add this flag to train with mixed precision (float16
+          computations with dynamic loss scaling). Requires TensorFlow 1.14 or
+          newer.""")
+        else:
+            args["mixed_precision"] = mixed_precision
+
         # Optimizer hyperparams
         for hp in self._hyperparams:
             hp_name = hp["name"]
@@ -349,20 +417,24 @@ class StandardRunner(object):
     def _run(self, testproblem, weight_decay, batch_size, num_epochs,
              learning_rate, lr_sched_epochs, lr_sched_factors, random_seed,
              data_dir, output_dir, train_log_interval, print_train_iter,
-             tf_logging, no_logs, **optimizer_hyperparams):
+             tf_logging, no_logs, xla=False, mixed_precision=False,
+             **optimizer_hyperparams):
         """Performs the actual run, given all the arguments."""
 
+        # Mixed precision training needs the API of TensorFlow 1.14 or newer.
+        if mixed_precision and not hasattr(
+                getattr(tf.train, "experimental", None),
+                "MixedPrecisionLossScaleOptimizer"):
+            raise RuntimeError(
+                """Mixed precision training requires TensorFlow 1.14 or newer
+                (found {0:s}).""".format(tf.__version__))
+
         # Set data directory of DeepOBS.
         if data_dir is not None:
             config.set_data_dir(data_dir)
 
         # Find testproblem by name and instantiate with batch size and weight decay.
-        try:
-            testproblem_mod = importlib.import_module(testproblem)
-            testproblem_cls = getattr(testproblem_mod, testproblem)
-            print("Loading local testproblem.")
-        except:
-            testproblem_cls = getattr(testproblems, testproblem)
+        testproblem_cls = _resolve_testproblem_cls(testproblem)
         if weight_decay is not None:
             tproblem = testproblem_cls(batch_size, weight_decay)
         else:
@@ -378,6 +450,12 @@ class StandardRunner(object):
         global_step = tf.Variable(0, trainable=False)
         learning_rate_var = tf.Variable(learning_rate, trainable=False)
         opt = self._optimizer_class(learning_rate_var, **optimizer_hyperparams)
+        if mixed_precision:
+            # Scale the loss dynamically to keep float16 gradients from
+            # underflowing. The float16 graph rewrite itself is only enabled
+            # for this run's session (see below).
+            opt = tf.train.experimental.MixedPrecisionLossScaleOptimizer(
+                opt, "dynamic")
         lr_schedule = runner_utils.make_lr_schedule(
             learning_rate, lr_sched_epochs, lr_sched_factors)
 
@@ -388,12 +466,19 @@ class StandardRunner(object):
             tf.get_collection(tf.GraphKeys.UPDATE_OPS)):
             step = opt.minimize(loss, global_step=global_step)
 
+        # Streaming means of the loss and accuracy over an evaluation phase.
+        # They are accumulated within the graph, so only the final averages
+        # have to be fetched.
+        (eval_loss, eval_acc, eval_update_op,
+         eval_reset_op) = runner_utils.make_streaming_means(
+             loss, tproblem.accuracy)
+
         # Create output folder
         if not no_logs:
             run_folder_name, file_name = runner_utils.make_run_name(
                 weight_decay, batch_size, num_epochs, learning_rate,
-                lr_sched_epochs, lr_sched_factors, random_seed,
-                **optimizer_hyperparams)
+                lr_sched_epochs, lr_sched_factors, random_seed, xla=xla,
+                mixed_precision=mixed_precision, **optimizer_hyperparams)
             directory = os.path.join(output_dir, testproblem, self._optimizer_name,
                                      run_folder_name)
             if not os.path.exists(directory):
@@ -402,7 +487,9 @@ class StandardRunner(object):
         # Lists to track train/test loss and accuracy.
         train_losses = []
         test_losses = []
-        minibatch_train_losses = []
+        # There are many mini-batch losses on long runs, so they are stored in
+        # a compact array of doubles rather than a list of float objects.
+        minibatch_train_losses = array.array("d")
         train_accuracies = []
         test_accuracies = []
 
@@ -423,12 +510,25 @@ class StandardRunner(object):
                 batch_size,
                 collections=[tf.GraphKeys.SUMMARIES, "per_epoch"])
 
+            # Global step after the update, fetched alongside the training step.
+            with tf.control_dependencies([step]):
+                new_global_step = global_step.read_value()
+
             per_iter_summaries = tf.summary.merge_all(key="per_iteration")
             per_epoch_summaries = tf.summary.merge_all(key="per_epoch")
             summary_writer = tf.summary.FileWriter(directory)
 
-        # Start tensorflow session and initialize variables.
-        sess = tf.Session()
+        # Start tensorflow session (optionally with XLA compilation and mixed
+        # precision) and initialize variables.
+        session_config = tf.ConfigProto()
+        if xla:
+            session_config.graph_options.optimizer_options.global_jit_level = (
+                tf.OptimizerOptions.ON_1)
+        if mixed_precision:
+            # Compute in float16 where it is numerically safe.
+            session_config.graph_options.rewrite_options.auto_mixed_precision = (
+                rewriter_config_pb2.RewriterConfig.ON)
+        sess = tf.Session(config=session_config)
         sess.run(tf.global_variables_initializer())
 
         # Wrapper functions for the evaluation phase.
@@ -446,29 +546,11 @@ class StandardRunner(object):
                 acc_list = train_accuracies
 
             # Compute average loss and (if applicable) accuracy.
-            loss_ = 0.0
-            num_iters = 0.0
-            acc_ = 0.0
-            if tproblem.accuracy is not None:
-                while True:
-                    try:
-                        l_, a_ = sess.run([loss, tproblem.accuracy])
-                        loss_ += l_
-                        acc_ += a_
-                        num_iters += 1.0
-                    except tf.errors.OutOfRangeError:
-                        break
-            else:  # accuracy is None
-                acc_ = 0.0
-                while True:
-                    try:
-                        l_ = sess.run(loss)
-                        loss_ += l_
-                        num_iters += 1.0
-                    except tf.errors.OutOfRangeError:
-                        break
-            loss_ /= num_iters
-            acc_ /= num_iters
+            sess.run(eval_reset_op)
+            for _ in runner_utils.iterate_batches(sess, eval_update_op):
+                pass
+            loss_, acc_ = sess.run([eval_loss, eval_acc])
+            loss_, acc_ = float(loss_), float(acc_)
 
             # Print and log the results.
             loss_list.append(loss_)
@@ -486,13 +568,23 @@ class StandardRunner(object):
                 summary_writer.add_summary(per_epoch_summary_,
                                            len(loss_list) - 1)
                 summary_writer.add_summary(summary, len(loss_list) - 1)
-                summary_writer.flush()
 
             print("{0:s} loss {1:g}, acc {2:f}".format(msg, loss_, acc_))
 
-        # Start of training loop.
-        for n in range(num_epochs + 1):
-            # Evaluate at beginning of epoch.
+        # Fetches for a training step. The loss (and summaries) are only fetched
+        # if we hit the train_log_interval; otherwise only the update is run,
+        # for which sess.run returns None.
+        if tf_logging:
+            log_fetches = [step, loss, per_iter_summaries, new_global_step]
+        else:
+            log_fetches = [step, loss]
+
+        def train_fetches(s):
+            """Returns the fetches for training step ``s`` of an epoch."""
+            return log_fetches if s % train_log_interval == 0 else step
+
+        def evaluate_all(n):
+            """Evaluates on the train eval and test data after ``n`` epochs."""
             print("********************************")
             print("Evaluating after {0:d} of {1:d} epochs...".format(
                 n, num_epochs))
@@ -500,45 +592,41 @@ class StandardRunner(object):
             evaluate(test=True)
             print("********************************")
 
-            # Break from train loop after the last round of evaluation
-            if n == num_epochs:
-                break
+        # Start of training loop.
+        for n in range(num_epochs):
+            # Evaluate at beginning of epoch.
+            evaluate_all(n)
 
             # Training
             if n in lr_schedule:
                 sess.run(learning_rate_var.assign(lr_schedule[n]))
                 print("Setting learning rate to {0:f}".format(lr_schedule[n]))
             sess.run(tproblem.train_init_op)
-            s = 0
-            while True:
-                try:
-                    # Training step, with logging if we hit the train_log_interval
-                    if s % train_log_interval == 0:
-                        if tf_logging:
-                            _, loss_, per_iter_summary_ = sess.run(
-                                [step, loss, per_iter_summaries])
-                            summary_writer.add_summary(per_iter_summary_,
-                                                       sess.run(global_step))
-                        else:
-                            _, loss_ = sess.run([step, loss])
-                        minibatch_train_losses.append(loss_.astype(float))
-                        if print_train_iter:
-                            print("Epoch {0:d}, step {1:d}: loss {2:g}".format(
-                                n, s, loss_))
-                    else:
-                        sess.run(step)
-                    s += 1
-                except tf.errors.OutOfRangeError:
-                    break
+            for s, results in enumerate(
+                    runner_utils.iterate_batches(sess, train_fetches)):
+                # Log the training step if its loss has been fetched
+                if results is not None:
+                    loss_ = results[1]
+                    if tf_logging:
+                        summary_writer.add_summary(results[2], results[3])
+                    minibatch_train_losses.append(loss_)
+                    if print_train_iter:
+                        print("Epoch {0:d}, step {1:d}: loss {2:g}".format(
+                            n, s, loss_))
+
+        # Evaluate after the last epoch.
+        evaluate_all(num_epochs)
 
         sess.close()
+        if tf_logging:
+            summary_writer.close()
         # --- End of training loop.
 
         # Put results into output dictionary.
         output = {
             "train_losses": train_losses,
             "test_losses": test_losses,
-            "minibatch_train_losses": minibatch_train_losses
+            "minibatch_train_losses": minibatch_train_losses.tolist()
         }
         if tproblem.accuracy is not None:
             output["train_accuracies"] = train_accuracies
@@ -555,6 +643,8 @@ class StandardRunner(object):
         output["lr_sched_factors"] = lr_sched_factors
         output["random_seed"] = random_seed
         output["train_log_interval"] = train_log_interval
+        output["xla"] = xla
+        output["mixed_precision"] = mixed_precision
 
         # Add optimizer hyperparameters as a sub-dictionary.
         output["hyperparams"] = optimizer_hyperparams
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Tests for the runner utilities."""
+
+import os
+import sys
+import unittest
+
+try:
+    import tensorflow as tf
+except ImportError:
+    raise unittest.SkipTest("TensorFlow is not installed.")
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from deepobs.tensorflow.runners import runner_utils
+
+
+class MakeRunNameTest(unittest.TestCase):
+    """Tests for the names of the run folders."""
+
+    def _run_folder_name(self, **kwargs):
+        """Returns the run folder name for a fixed setting."""
+        run_folder_name, _ = runner_utils.make_run_name(
+            None, 128, 10, 0.01, None, None, 42, momentum=0.9, **kwargs)
+        return run_folder_name
+
+    def test_xla_marker(self):
+        """Tests that XLA runs are written to a separate setting folder."""
+        self.assertFalse(self._run_folder_name().endswith("__xla"))
+        self.assertEqual(
+            self._run_folder_name(xla=True),
+            self._run_folder_name() + "__xla")
+
+    def test_mixed_precision_marker(self):
+        """Tests that mixed precision runs get a separate setting folder."""
+        self.assertEqual(
+            self._run_folder_name(mixed_precision=True),
+            self._run_folder_name() + "__mixed_precision")
+        self.assertEqual(
+            self._run_folder_name(xla=True, mixed_precision=True),
+            self._run_folder_name() + "__xla__mixed_precision")
+
+
+class StreamingMeansTest(unittest.TestCase):
+    """Tests for the in-graph streaming means used in the evaluation phase."""
+
+    def setUp(self):
+        """Sets up a toy problem with two phases on ``tf.data.Dataset.range``.
+
+        The train phase yields the batches ``[0, 1, 2], [3, 4, 5], [6, 7, 8],
+        [9]`` and the test phase the batches ``[100, 101], [102, 103]``.
+        """
+        self.graph = tf.Graph()
+        with self.graph.as_default():
+            train_data = tf.data.Dataset.range(10).batch(3)
+            test_data = tf.data.Dataset.range(100, 104).batch(2)
+            iterator = tf.data.Iterator.from_structure(
+                train_data.output_types, train_data.output_shapes)
+            self.train_init_op = iterator.make_initializer(train_data)
+            self.test_init_op = iterator.make_initializer(test_data)
+            x = tf.cast(iterator.get_next(), tf.float32)
+            self.loss = tf.reduce_mean(x)
+            self.accuracy = tf.reduce_mean(tf.cast(x > 5.0, tf.float32))
+
+    def _python_average(self, sess, init_op):
+        """Averages loss and accuracy per batch in Python (as done before)."""
+        sess.run(init_op)
+        loss_, acc_, num_iters = 0.0, 0.0, 0.0
+        while True:
+            try:
+                l_, a_ = sess.run([self.loss, self.accuracy])
+                loss_ += l_
+                acc_ += a_
+                num_iters += 1.0
+            except tf.errors.OutOfRangeError:
+                break
+        return loss_ / num_iters, acc_ / num_iters
+
+    def _streaming_average(self, sess, means, init_op, reset=True):
+        """Accumulates a phase with the streaming means and fetches them."""
+        mean_loss, mean_acc, update_op, reset_op = means
+        if reset:
+            sess.run(reset_op)
+        sess.run(init_op)
+        while True:
+            try:
+                sess.run(update_op)
+            except tf.errors.OutOfRangeError:
+                break
+        return sess.run([mean_loss, mean_acc])
+
+    def test_matches_per_batch_average(self):
+        """Tests that the streaming means equal the per-batch Python average."""
+        with self.graph.as_default():
+            means = runner_utils.make_streaming_means(self.loss, self.accuracy)
+            with tf.Session() as sess:
+                for init_op in [self.train_init_op, self.test_init_op]:
+                    expected = self._python_average(sess, init_op)
+                    actual = self._streaming_average(sess, means, init_op)
+                    np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+    def test_reset_between_phases(self):
+        """Tests that ``reset_op`` discards the values of the previous phase."""
+        with self.graph.as_default():
+            means = runner_utils.make_streaming_means(self.loss, self.accuracy)
+            with tf.Session() as sess:
+                train_means = self._streaming_average(sess, means,
+                                                      self.train_init_op)
+                np.testing.assert_allclose(
+                    train_means, [5.25, 0.5], rtol=1e-6)
+                test_means = self._streaming_average(sess, means,
+                                                     self.test_init_op)
+                np.testing.assert_allclose(
+                    test_means, [101.5, 1.0], rtol=1e-6)
+                # Without a reset, both phases are averaged together.
+                self._streaming_average(sess, means, self.train_init_op)
+                mixed_means = self._streaming_average(
+                    sess, means, self.test_init_op, reset=False)
+                np.testing.assert_allclose(
+                    mixed_means, [(4 * 5.25 + 2 * 101.5) / 6, 4.0 / 6],
+                    rtol=1e-6)
+
+    def test_no_accuracy(self):
+        """Tests that the mean accuracy is zero if there is no accuracy."""
+        with self.graph.as_default():
+            means = runner_utils.make_streaming_means(self.loss)
+            with tf.Session() as sess:
+                mean_loss, mean_acc = self._streaming_average(
+                    sess, means, self.train_init_op)
+                self.assertAlmostEqual(mean_loss, 5.25, places=5)
+                self.assertEqual(mean_acc, 0.0)
+
+
+class IterateBatchesTest(unittest.TestCase):
+    """Tests for iterating over the mini-batches of an epoch."""
+
+    def setUp(self):
+        """Sets up an epoch with the batches ``[0, 1], [2, 3], [4]``."""
+        self.graph = tf.Graph()
+        with self.graph.as_default():
+            data = tf.data.Dataset.range(5).batch(2)
+            iterator = data.make_initializable_iterator()
+            self.init_op = iterator.initializer
+            self.x = iterator.get_next()
+
+    def test_plain_fetches(self):
+        """Tests that plain fetches are run once per mini-batch."""
+        with self.graph.as_default():
+            with tf.Session() as sess:
+                sess.run(self.init_op)
+                results = list(runner_utils.iterate_batches(sess, self.x))
+        self.assertEqual([r.tolist() for r in results], [[0, 1], [2, 3], [4]])
+
+    def test_callable_fetches(self):
+        """Tests that a callable receives the step number within the epoch."""
+        steps = []
+
+        def fetches(s):
+            steps.append(s)
+            return [self.x] if s % 2 == 0 else self.x
+
+        with self.graph.as_default():
+            with tf.Session() as sess:
+                sess.run(self.init_op)
+                results = list(runner_utils.iterate_batches(sess, fetches))
+        # The last call raises the ``OutOfRangeError`` ending the epoch.
+        self.assertEqual(steps, [0, 1, 2, 3])
+        self.assertEqual(len(results), 3)
+        self.assertIsInstance(results[0], list)
+        self.assertEqual(results[0][0].tolist(), [0, 1])
+        self.assertEqual(results[1].tolist(), [2, 3])
+        self.assertEqual(results[2][0].tolist(), [4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Tests for the StandardRunner."""
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import tensorflow
+except ImportError:
+    raise unittest.SkipTest("TensorFlow is not installed.")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from deepobs.tensorflow import testproblems
+from deepobs.tensorflow.runners import standard_runner
+
+
+class ResolveTestproblemClsTest(unittest.TestCase):
+    """Tests for finding testproblem classes by name."""
+
+    def setUp(self):
+        """Creates a temporary directory for local testproblem modules."""
+        standard_runner._TESTPROBLEM_CLASSES.clear()
+        self.tmp_dir = tempfile.mkdtemp()
+        sys.path.insert(0, self.tmp_dir)
+        self.local_modules = []
+
+    def tearDown(self):
+        """Removes the local testproblem modules and clears the cache."""
+        sys.path.remove(self.tmp_dir)
+        shutil.rmtree(self.tmp_dir)
+        for name in self.local_modules:
+            sys.modules.pop(name, None)
+        standard_runner._TESTPROBLEM_CLASSES.clear()
+
+    def _write_module(self, name, source):
+        """Writes a local module ``name`` with the given source code."""
+        with open(os.path.join(self.tmp_dir, name + ".py"), "w") as f:
+            f.write(source)
+        self.local_modules.append(name)
+        importlib.invalidate_caches()
+
+    def test_fallback_to_deepobs(self):
+        """Tests that DeepOBS testproblems are found without a local module."""
+        self.assertIs(
+            standard_runner._resolve_testproblem_cls("mnist_mlp"),
+            testproblems.mnist_mlp)
+
+    def test_local_testproblem(self):
+        """Tests that a local testproblem takes precedence."""
+        self._write_module("mnist_mlp", "class mnist_mlp(object):\n    pass\n")
+        testproblem_cls = standard_runner._resolve_testproblem_cls("mnist_mlp")
+        self.assertIsNot(testproblem_cls, testproblems.mnist_mlp)
+        self.assertEqual(testproblem_cls.__module__, "mnist_mlp")
+
+    def test_module_without_class(self):
+        """Tests the fallback for a local module lacking the class."""
+        self._write_module("mnist_logreg", "x = 1\n")
+        self.assertIs(
+            standard_runner._resolve_testproblem_cls("mnist_logreg"),
+            testproblems.mnist_logreg)
+
+    def test_cache_hit(self):
+        """Tests that resolved classes are not imported a second time."""
+        testproblem_cls = standard_runner._resolve_testproblem_cls("mnist_mlp")
+        with mock.patch.object(standard_runner.importlib,
+                               "import_module") as import_module:
+            self.assertIs(
+                standard_runner._resolve_testproblem_cls("mnist_mlp"),
+                testproblem_cls)
+            import_module.assert_not_called()
+
+    def test_import_error_propagates(self):
+        """Tests that a failing import in a local module is not swallowed."""
+        self._write_module("mnist_2c2d",
+                           "import deepobs_missing_dependency\n"
+                           "class mnist_2c2d(object):\n    pass\n")
+        with self.assertRaises(ModuleNotFoundError) as context:
+            standard_runner._resolve_testproblem_cls("mnist_2c2d")
+        self.assertEqual(context.exception.name, "deepobs_missing_dependency")
+        self.assertNotIn("mnist_2c2d", standard_runner._TESTPROBLEM_CLASSES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,11 @@
 import os
 import sys
 import unittest
-import tensorflow as tf
+
+try:
+    import tensorflow as tf
+except ImportError:
+    raise unittest.SkipTest("TensorFlow is not installed.")
 import numpy as np
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))